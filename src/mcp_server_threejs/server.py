@@ -1,17 +1,27 @@
+import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import tempfile
 import zipfile
+import mmap
+import struct
 import io
 import shutil
 import argparse
+import functools
+import sys
 from pathlib import Path
+from collections import OrderedDict
 from urllib.parse import urlparse
 from fastapi import FastAPI
 import time
+import threading
+import concurrent.futures
 
 from mcp.server import Server
 import mcp.types as types
@@ -19,28 +29,189 @@ import mcp.server.stdio
 from mcp.server.models import InitializationOptions
 from mcp.server import NotificationOptions
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mcp_threejs")
 
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to an indented JSON string, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def _json_dumpb(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _json_loads(data) -> Any:
+    """Parse a JSON string or bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Default location of stored OAuth2 credentials in the user's home directory
+DEFAULT_CREDENTIALS_PATH = os.path.join(os.path.expanduser("~"), ".sketchfab_credentials.json")
+
+# Backoff bounds for retrying token refresh after OAuth server errors
+_REFRESH_BACKOFF_MIN = 60
+_REFRESH_BACKOFF_MAX = 15 * 60
+
+# Seconds to reuse auth headers after a token could not be refreshed
+_AUTH_RETRY_INTERVAL = 30
+
+# Response caches for search and model lookups
+_SEARCH_CACHE_TTL = 300  # 5 minutes
+_MODEL_CACHE_TTL = 600  # 10 minutes
+_CACHE_MAX_ENTRIES = 128
+
+# Substrings marking environment variables whose values must not be logged
+_SENSITIVE_ENV_MARKERS = ("key", "token", "secret")
+
+
+def _mask_env_value(key: str, value: str) -> str:
+    """Mask the value of an environment variable that looks sensitive"""
+    lower_key = key.lower()
+    return '***' if any(marker in lower_key for marker in _SENSITIVE_ENV_MARKERS) else value
+
+
+# Parsed credentials files, keyed by path, with the mtime_ns they were read at
+_creds_cache: Dict[str, Tuple[int, Dict]] = {}
+
+
+def _read_credentials_file(credentials_file: str) -> Dict:
+    """Read and parse a credentials file, reusing the result while the file is unchanged"""
+    mtime_ns = os.stat(credentials_file).st_mtime_ns
+    entry = _creds_cache.get(credentials_file)
+    if entry is not None and entry[0] == mtime_ns:
+        return entry[1]
+    with open(credentials_file, 'rb') as f:
+        credentials = _json_loads(f.read())
+    _creds_cache[credentials_file] = (mtime_ns, credentials)
+    return credentials
+
+
+def _invalidate_credentials_cache(credentials_file: str):
+    """Drop the cached entry for a credentials file"""
+    _creds_cache.pop(credentials_file, None)
+
+
+# Characters ZipFile.extractall replaces in member names on Windows
+_ZIP_WINDOWS_ILLEGAL = str.maketrans(':<>|"?*', '_______')
+
+
+def _zip_member_path(extract_dir: str, member_name: str) -> str:
+    """Map an archive member name to a path under extract_dir, cleaned the way ZipFile.extractall does"""
+    arcname = member_name.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    parts = [part for part in arcname.split(os.path.sep) if part not in ('', os.path.curdir, os.path.pardir)]
+    if os.path.sep == '\\':
+        # Strip characters Windows forbids and trailing dots, as zipfile does
+        parts = [part.translate(_ZIP_WINDOWS_ILLEGAL).rstrip('.') for part in parts]
+        parts = [part for part in parts if part]
+    return os.path.join(extract_dir, *parts)
+
+
+# Process umask, used to give downloaded files default permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# ZIP end-of-central-directory and central-directory record layouts
+_ZIP_EOCD_SIGNATURE = b'PK\x05\x06'
+_ZIP_EOCD_STRUCT = struct.Struct("<4s4H2LH")
+_ZIP_CDIR_SIGNATURE = b'PK\x01\x02'
+_ZIP_CDIR_STRUCT = struct.Struct("<4s6H3L5H2L")
+
+
+def _list_zip_members(zip_path: str) -> List[str]:
+    """List ZIP member names by reading the central directory directly, without decompressing"""
+    with open(zip_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # The EOCD record sits in the last 22 bytes plus an optional comment of up to 64KB
+        search_start = max(0, len(mm) - _ZIP_EOCD_STRUCT.size - 0xFFFF)
+        eocd_pos = mm.rfind(_ZIP_EOCD_SIGNATURE, search_start)
+        if eocd_pos < 0 or eocd_pos + _ZIP_EOCD_STRUCT.size > len(mm):
+            raise zipfile.BadZipFile("End of central directory record not found")
+        _, _, _, _, total_entries, cdir_size, cdir_offset, _ = _ZIP_EOCD_STRUCT.unpack_from(mm, eocd_pos)
+        
+        # ZIP64 archives keep the real values elsewhere, let zipfile handle them
+        if total_entries == 0xFFFF or cdir_size == 0xFFFFFFFF or cdir_offset == 0xFFFFFFFF:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                return zip_ref.namelist()
+                
+        # Locate the central directory relative to the EOCD to tolerate prepended data
+        pos = eocd_pos - cdir_size
+        names = []
+        for _ in range(total_entries):
+            record = _ZIP_CDIR_STRUCT.unpack_from(mm, pos)
+            if record[0] != _ZIP_CDIR_SIGNATURE:
+                raise zipfile.BadZipFile("Bad central directory record")
+            flags, name_len, extra_len, comment_len = record[3], record[10], record[11], record[12]
+            pos += _ZIP_CDIR_STRUCT.size
+            name = mm[pos:pos + name_len]
+            names.append(name.decode('utf-8' if flags & 0x800 else 'cp437'))
+            pos += name_len + extra_len + comment_len
+        return names
+
+
+def _extract_zip(zip_path: str, extract_dir: str) -> List[str]:
+    """Extract a ZIP archive with a thread pool and return the member names"""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        members = zip_ref.infolist()
+        
+    # Create directories up front so workers never race on makedirs
+    files = {}
+    for member in members:
+        target = _zip_member_path(extract_dir, member.filename)
+        if member.is_dir() or target == extract_dir:
+            os.makedirs(target, exist_ok=True)
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        files[target] = member
+        
+    def _extract_batch(batch):
+        # ZipFile is not safe for concurrent reads, so each worker opens its own
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            for target, member in batch:
+                with zip_ref.open(member) as src, open(target, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1 << 20)
+                    
+    items = list(files.items())
+    workers = min(os.cpu_count() or 1, len(items))
+    if workers:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_extract_batch, [items[i::workers] for i in range(workers)]))
+            
+    return [member.filename for member in members]
+
+
 class SketchfabClient:
     @classmethod
     def load_from_file(cls, credentials_file: Optional[str] = None):
         """Load credentials from file and create a new client instance"""
         if not credentials_file:
             # Use default location in user's home directory
-            home_dir = os.path.expanduser("~")
-            credentials_file = os.path.join(home_dir, ".sketchfab_credentials.json")
+            credentials_file = DEFAULT_CREDENTIALS_PATH
             
         try:
             if not os.path.exists(credentials_file):
-                logger.warning(f"Credentials file not found: {credentials_file}")
+                logger.warning("Credentials file not found: %s", credentials_file)
                 return None
                 
-            with open(credentials_file, 'r') as f:
-                credentials = json.load(f)
+            credentials = _read_credentials_file(credentials_file)
                 
-            logger.info(f"Loaded credentials from {credentials_file}")
+            logger.info("Loaded credentials from %s", credentials_file)
             
             # Create new client with loaded credentials
             client = cls(
@@ -57,7 +228,7 @@ class SketchfabClient:
             return client
             
         except Exception as e:
-            logger.error(f"Failed to load credentials: {str(e)}")
+            logger.error("Failed to load credentials: %s", e)
             return None
         
     def __init__(self, access_token: Optional[str] = None, refresh_token: Optional[str] = None, 
@@ -74,12 +245,38 @@ class SketchfabClient:
         if self.access_token and not self.token_expiry:
             self.token_expiry = time.time() + (30 * 24 * 60 * 60)  # 30 days in seconds
         
+        # Cached auth headers, re-validated at most every few minutes
+        self._auth_headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
+        self._next_check_ts = 0.0
+        
+        # Concurrent refresh attempts share a single in-flight request
+        self._refresh_lock = threading.Lock()
+        self._refresh_in_flight: Optional[concurrent.futures.Future] = None
+        self._refresh_generation = 0
+        
+        # Back off from the OAuth endpoint after server errors
+        self._refresh_forbidden_until = 0.0
+        self._refresh_backoff = _REFRESH_BACKOFF_MIN
+        
+        # TTL caches for search results and model details, in LRU order
+        self._search_cache: OrderedDict[Tuple[str, int], Tuple[float, List[Dict]]] = OrderedDict()
+        self._model_cache: OrderedDict[str, Tuple[float, Dict]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Shared session so keep-alive connections are reused across API calls
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+        self.session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retries))
+        
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
+        
     def store_updated_credentials(self, credentials_file: Optional[str] = None) -> bool:
         """Store updated credentials to file"""
         if not credentials_file:
             # Use default location in user's home directory
-            home_dir = os.path.expanduser("~")
-            credentials_file = os.path.join(home_dir, ".sketchfab_credentials.json")
+            credentials_file = DEFAULT_CREDENTIALS_PATH
             
         try:
             # Store only sensitive data if it exists
@@ -91,25 +288,60 @@ class SketchfabClient:
                 "token_expiry": self.token_expiry if self.token_expiry else 0
             }
             
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(credentials_file), exist_ok=True)
+            # Create directory if it doesn't exist (a bare filename has no directory part)
+            credentials_dir = os.path.dirname(credentials_file)
+            if credentials_dir and not os.path.isdir(credentials_dir):
+                os.makedirs(credentials_dir, exist_ok=True)
             
-            with open(credentials_file, 'w') as f:
-                json.dump(credentials, f)
+            # Serialize up front and write the file in a single call
+            with open(credentials_file, 'wb') as f:
+                f.write(_json_dumpb(credentials))
+            _invalidate_credentials_cache(credentials_file)
                 
-            logger.info(f"Stored updated credentials to {credentials_file}")
+            logger.info("Stored updated credentials to %s", credentials_file)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to store credentials: {str(e)}")
+            logger.error("Failed to store credentials: %s", e)
             return False
         
-    def refresh_access_token(self) -> bool:
+    def refresh_access_token(self, generation: Optional[int] = None) -> bool:
+        """Refresh the access token, joining any refresh already in flight"""
+        with self._refresh_lock:
+            # Another caller already refreshed since this one checked the expiry
+            if generation is not None and generation != self._refresh_generation:
+                return True
+            future = self._refresh_in_flight
+            is_owner = future is None
+            if is_owner:
+                future = concurrent.futures.Future()
+                self._refresh_in_flight = future
+                
+        if not is_owner:
+            logger.info("Access token refresh already in progress, waiting for it")
+            return future.result()
+            
+        try:
+            result = self._refresh_access_token()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._refresh_lock:
+                self._refresh_in_flight = None
+        
+    def _refresh_access_token(self) -> bool:
         """Refresh the access token using the refresh token"""
         if not all([self.refresh_token, self.client_id, self.client_secret]):
             logger.warning("Cannot refresh token: missing refresh_token, client_id, or client_secret")
             return False
             
+        if time.monotonic() < self._refresh_forbidden_until:
+            logger.debug("Skipping token refresh while backing off after a server error")
+            return False
+            
         try:
             logger.info("Attempting to refresh access token")
             
@@ -120,7 +352,7 @@ class SketchfabClient:
                 'refresh_token': self.refresh_token
             }
             
-            response = requests.post(self.oauth_url, data=data)
+            response = self.session.post(self.oauth_url, data=data)
             response.raise_for_status()
             
             token_data = response.json()
@@ -138,14 +370,35 @@ class SketchfabClient:
                 self.token_expiry = time.time() + (30 * 24 * 60 * 60)
                 
             logger.info("Successfully refreshed access token")
+            self._refresh_backoff = _REFRESH_BACKOFF_MIN
+            with self._refresh_lock:
+                self._refresh_generation += 1
+            
+            # Invalidate cached auth headers
+            self._auth_headers = {"Authorization": f"Bearer {self.access_token}"} if self.access_token else {}
+            self._next_check_ts = 0.0
             
             # Store updated credentials
             self.store_updated_credentials()
             
             return True
             
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status in (400, 401, 403):
+                # The refresh token was rejected, stop trying to use it
+                logger.error("Refresh token was rejected (HTTP %s), disabling token refresh", status)
+                self.refresh_token = None
+            elif status is not None and (status == 429 or status >= 500):
+                logger.error("Token refresh failed with HTTP %s, retrying in %d seconds", status, self._refresh_backoff)
+                self._refresh_forbidden_until = time.monotonic() + self._refresh_backoff
+                self._refresh_backoff = min(self._refresh_backoff * 2, _REFRESH_BACKOFF_MAX)
+            else:
+                logger.error("Failed to refresh access token: %s", e)
+            return False
+            
         except Exception as e:
-            logger.error(f"Failed to refresh access token: {str(e)}")
+            logger.error("Failed to refresh access token: %s", e)
             return False
         
     def ensure_valid_token(self):
@@ -153,91 +406,150 @@ class SketchfabClient:
         if not self.access_token:
             return False
             
+        # Read before the expiry check so a refresh finishing meanwhile is detected
+        generation = self._refresh_generation
         if self.token_expiry and time.time() > self.token_expiry - 300:  # Refresh 5 minutes before expiry
+            # Without a refresh token the current one is all we have until it expires
+            if not self.refresh_token:
+                return time.time() < self.token_expiry
             logger.info("Access token is about to expire, refreshing")
-            return self.refresh_access_token()
+            return self.refresh_access_token(generation)
             
         return True
         
     def get_auth_headers(self):
         """Return authorization headers if access token is available"""
-        headers = {}
+        # Token was validated recently, reuse the cached headers
+        if time.monotonic() < self._next_check_ts:
+            return self._auth_headers
         
         # Try to refresh token if needed
         self.ensure_valid_token()
         
-        if self.access_token:
-            headers = {"Authorization": f"Bearer {self.access_token}"}
-            logger.info(f"Using OAuth2 authentication header")
+        # Never send a token past its expiry, e.g. when the refresh was rejected
+        token_expired = bool(self.token_expiry) and time.time() >= self.token_expiry
+        if self.access_token and not token_expired:
+            self._auth_headers = {"Authorization": f"Bearer {self.access_token}"}
         else:
-            logger.info("No access token available, making unauthenticated request")
-        return headers
+            self._auth_headers = {}
+            logger.debug("No valid access token available, making unauthenticated request")
+        
+        # Re-check at most every 5 minutes, and never past the refresh window
+        next_check = 300.0
+        if self.token_expiry:
+            remaining = self.token_expiry - time.time()
+            next_check = min(next_check, remaining - 300)
+            if next_check <= 0:
+                # Inside the refresh window and not refreshed, so retry shortly
+                # rather than on every call, but never past the actual expiry
+                next_check = min(_AUTH_RETRY_INTERVAL, remaining) if remaining > 0 else _AUTH_RETRY_INTERVAL
+        self._next_check_ts = time.monotonic() + next_check
+        return self._auth_headers
+        
+    def _cache_get(self, cache: OrderedDict, key, ttl: float):
+        """Return a cached value if it is younger than ttl seconds, else None"""
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= ttl:
+                del cache[key]
+                return None
+            cache.move_to_end(key)
+            return entry[1]
+        
+    def _cache_put(self, cache: OrderedDict, key, value):
+        """Store a value in a cache, evicting the least recently used entries when full"""
+        with self._cache_lock:
+            cache[key] = (time.monotonic(), value)
+            cache.move_to_end(key)
+            while len(cache) > _CACHE_MAX_ENTRIES:
+                cache.popitem(last=False)
+        
+    @staticmethod
+    def _to_model(model: Dict) -> Dict:
+        """Reduce a Sketchfab search result to the fields returned by search"""
+        get = model.get
+        images = (get("thumbnails") or {}).get("images") or [{}]
+        archives = get("archives")
+        return {
+            "uid": get("uid", ""),
+            "name": get("name", ""),
+            "description": get("description", ""),
+            "viewerUrl": get("viewerUrl", ""),
+            "embedUrl": get("embedUrl", ""),
+            "thumbnailUrl": images[0].get("url", ""),
+            "user": (get("user") or {}).get("username", ""),
+            "isDownloadable": get("isDownloadable", False),
+            "formats": {
+                format_name: format_data.get("size", 0)
+                for format_name, format_data in archives.items()
+                if format_data
+            } if archives else {}
+        }
         
     def search(self, query: str, limit: int = 10) -> List[Dict]:
         """Search for downloadable models on Sketchfab API"""
+        cache_key = (query.lower().strip(), limit)
+        cached = self._cache_get(self._search_cache, cache_key, _SEARCH_CACHE_TTL)
+        if cached is not None:
+            logger.info("Search cache hit for query: %s", query)
+            return list(cached)
+            
         try:
             params = {"q": query}
             if limit:
                 params["count"] = min(limit, 24)  # API limit is 24
             
-            logger.info(f"Search request params: {params}")
+            logger.info("Search request params: %s", params)
                 
-            response = requests.get(
+            response = self.session.get(
                 f"{self.api_url}/search",
                 params=params
             )
             response.raise_for_status()
             
-            logger.info(f"Search response status: {response.status_code}")
+            logger.info("Search response status: %d", response.status_code)
             data = response.json()
             
             # Extract only downloadable models from the results
-            downloadable_models = []
-            if "results" in data and "models" in data["results"]:
-                for model in data["results"]["models"]:
-                    isDownloadable = model.get("isDownloadable", False)
-                    if not isDownloadable:
-                        logger.info(f"Skipping model {model.get('name', model.get('uid', ''))} because it is not downloadable")
-                        continue
-                    model_data = {
-                        "uid": model.get("uid", ""),
-                        "name": model.get("name", ""),
-                        "description": model.get("description", ""),
-                        "viewerUrl": model.get("viewerUrl", ""),
-                        "embedUrl": model.get("embedUrl", ""),
-                        "thumbnailUrl": model.get("thumbnails", {}).get("images", [{}])[0].get("url", "") if model.get("thumbnails") else "",
-                        "user": model.get("user", {}).get("username", "") if model.get("user") else "",
-                        "isDownloadable": isDownloadable,
-                        "formats": {
-                            format_name: format_data.get("size", 0) 
-                            for format_name, format_data in model.get("archives", {}).items()
-                            if format_data
-                        }
-                    }
-                    downloadable_models.append(model_data)
-            
-            return downloadable_models
+            models = (data.get("results") or {}).get("models") or []
+            downloadable_models = [self._to_model(model) for model in models if model.get("isDownloadable")]
+            if logger.isEnabledFor(logging.DEBUG):
+                for model in models:
+                    if not model.get("isDownloadable"):
+                        logger.debug("Skipping model %s because it is not downloadable", model.get('name', model.get('uid', '')))
+            
+            self._cache_put(self._search_cache, cache_key, downloadable_models)
+            return list(downloadable_models)
             
         except Exception as e:
-            logger.error(f"Failed to search Sketchfab: {str(e)}")
+            logger.error("Failed to search Sketchfab: %s", e)
             return []
     
     def get_model(self, model_id: str) -> Dict:
         """Get detailed information about a model by ID"""
+        cached = self._cache_get(self._model_cache, model_id, _MODEL_CACHE_TTL)
+        if cached is not None:
+            logger.info("Model cache hit for ID: %s", model_id)
+            return dict(cached)
+            
         try:
             headers = self.get_auth_headers()
-            logger.info(f"Get model request for ID: {model_id}")
+            logger.info("Get model request for ID: %s", model_id)
             
-            response = requests.get(
+            response = self.session.get(
                 f"{self.api_url}/models/{model_id}",
                 headers=headers
             )
             response.raise_for_status()
             
-            logger.info(f"Get model response status: {response.status_code}")
-            return response.json()
+            logger.info("Get model response status: %d", response.status_code)
+            model = response.json()
+            self._cache_put(self._model_cache, model_id, model)
+            return dict(model)
         except Exception as e:
-            logger.error(f"Failed to get model details: {str(e)}")
+            logger.error("Failed to get model details: %s", e)
             raise ValueError(f"Failed to get model details: {str(e)}")
             
     def get_download_link(self, model_id: str) -> Dict:
@@ -247,92 +559,124 @@ class SketchfabClient:
                 raise ValueError("OAuth2 access token is required for downloading models")
             
             headers = self.get_auth_headers()
-            logger.info(f"Get download link request for ID: {model_id}")
+            logger.info("Get download link request for ID: %s", model_id)
                 
-            response = requests.get(
+            response = self.session.get(
                 f"{self.api_url}/models/{model_id}/download",
                 headers=headers
             )
             response.raise_for_status()
             
-            logger.info(f"Get download link response status: {response.status_code}")
+            logger.info("Get download link response status: %d", response.status_code)
             return response.json()
         except Exception as e:
-            logger.error(f"Failed to get download link: {str(e)}")
+            logger.error("Failed to get download link: %s", e)
             raise ValueError(f"Failed to get download link: {str(e)}")
             
-    def download_model(self, download_url: str, output_path: Optional[str] = None) -> Dict:
-        """Download a model file from the given URL"""
+    def download_model(self, download_url: str, output_path: Optional[str] = None, list_only: bool = False) -> Dict:
+        """Download a model file from the given URL, optionally listing ZIP members without extracting"""
         try:
             # Download the file
-            logger.info(f"Downloading model from URL: {download_url}")
-            
-            response = requests.get(download_url, stream=True, timeout=300)  # 5 minute timeout
-            response.raise_for_status()
-            
-            logger.info(f"Download response status: {response.status_code}")
-            logger.info(f"Download content type: {response.headers.get('Content-Type')}")
-            logger.info(f"Download content length: {response.headers.get('Content-Length')}")
-            # Determine if it's a ZIP file
-            is_zip = False
-            content = response.content
-            if len(content) >= 4 and content[0:4] == b'PK\x03\x04':
-                is_zip = True
+            logger.info("Downloading model from URL: %s", download_url)
+            
+            # Release the pooled connection even if saving the body fails
+            with self.session.get(download_url, stream=True, timeout=300) as response:  # 5 minute timeout
+                response.raise_for_status()
+            
+                logger.info("Download response status: %d", response.status_code)
+                logger.debug("Download content type: %s", response.headers.get('Content-Type'))
+                logger.debug("Download content length: %s", response.headers.get('Content-Length'))
+                # Stream the body in chunks so large archives are never held in memory
+                chunks = response.iter_content(chunk_size=1 << 20)
+            
+                # Determine if it's a ZIP file from the leading bytes of the stream;
+                # decoded chunks can be short, so read until the magic is covered
+                head = b""
+                for chunk in chunks:
+                    head += chunk
+                    if len(head) >= 4:
+                        break
+                is_zip = head.startswith(b'PK\x03\x04')
                 
-            # Determine filename and path
-            if not output_path:
-                # Create a temporary file
-                if is_zip:
-                    temp_file = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
+                # Determine filename and path
+                if output_path:
+                    # Stream beside the target and only replace it once the body is complete
+                    fd, write_path = tempfile.mkstemp(
+                        dir=os.path.dirname(output_path) or None,
+                        prefix=os.path.basename(output_path) + ".",
+                        suffix=".part"
+                    )
                 else:
-                    temp_file = tempfile.NamedTemporaryFile(delete=False)
-                output_path = temp_file.name
-                temp_file.close()
+                    # Create a temporary file and write through its already-open descriptor
+                    fd, output_path = tempfile.mkstemp(suffix=".zip" if is_zip else "")
+                    write_path = output_path
                 
-            # Save the file
-            with open(output_path, 'wb') as f:
-                f.write(content)
+                # Save the file
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(head)
+                        for chunk in chunks:
+                            f.write(chunk)
+                except BaseException:
+                    # The file was created by this call, so don't leave a partial copy behind
+                    os.unlink(write_path)
+                    raise
+                    
+                if write_path != output_path:
+                    # mkstemp creates files as 0600, give the target its usual permissions
+                    if os.path.exists(output_path):
+                        shutil.copymode(output_path, write_path)
+                    else:
+                        os.chmod(write_path, 0o666 & ~_UMASK)
+                    os.replace(write_path, output_path)
                 
             # Handle ZIP extraction
             extracted_files = []
-            if is_zip:
+            extract_dir = None
+            if is_zip and list_only:
+                extracted_files = _list_zip_members(output_path)
+            elif is_zip:
                 # Create extraction directory
                 extract_dir = output_path + "_extracted"
                 os.makedirs(extract_dir, exist_ok=True)
                 
                 # Extract the ZIP file
-                with zipfile.ZipFile(output_path, 'r') as zip_ref:
-                    zip_ref.extractall(extract_dir)
-                    extracted_files = zip_ref.namelist()
+                extracted_files = _extract_zip(output_path, extract_dir)
                     
             return {
                 "output_path": output_path,
                 "is_zip": is_zip,
-                "extract_dir": extract_dir if is_zip else None,
+                "extract_dir": extract_dir,
                 "extracted_files": extracted_files
             }
                 
         except Exception as e:
-            logger.error(f"Failed to download model: {str(e)}")
+            logger.error("Failed to download model: %s", e)
             raise ValueError(f"Failed to download model: {str(e)}")
 
 
-def get_oauth_credentials():
-    """Get Sketchfab OAuth2 credentials from environment variables, command-line arguments or saved file"""
-    # Parse command-line arguments
+@functools.lru_cache(maxsize=1)
+def parse_args(argv: Tuple[str, ...]) -> argparse.Namespace:
+    """Parse command-line arguments, memoized on the argument tuple"""
     parser = argparse.ArgumentParser(description='Threejs Server for Sketchfab model search')
     parser.add_argument('--sketchfab_access_token', type=str, help='Sketchfab OAuth2 access token for authentication')
     parser.add_argument('--sketchfab_refresh_token', type=str, help='Sketchfab OAuth2 refresh token for renewing access')
     parser.add_argument('--sketchfab_client_id', type=str, help='Sketchfab OAuth2 client ID')
     parser.add_argument('--sketchfab_client_secret', type=str, help='Sketchfab OAuth2 client secret')
     parser.add_argument('--credentials_file', type=str, help='Path to file with stored OAuth2 credentials')
-    args, _ = parser.parse_known_args()
+    args, _ = parser.parse_known_args(list(argv))
+    return args
+
+
+def get_oauth_credentials(args: Optional[argparse.Namespace] = None):
+    """Get Sketchfab OAuth2 credentials from environment variables, command-line arguments or saved file"""
+    if args is None:
+        args = parse_args(tuple(sys.argv[1:]))
     
     # Try to load from credentials file first
     credentials_file = args.credentials_file
     if not credentials_file:
-        home_dir = os.path.expanduser("~")
-        credentials_file = os.path.join(home_dir, ".sketchfab_credentials.json")
+        credentials_file = DEFAULT_CREDENTIALS_PATH
     
     # Initialize with empty values
     access_token = ""
@@ -344,22 +688,22 @@ def get_oauth_credentials():
     # Try to load from file first
     try:
         if os.path.exists(credentials_file):
-            logger.info(f"Loading credentials from file: {credentials_file}")
-            with open(credentials_file, 'r') as f:
-                file_credentials = json.load(f)
-                access_token = file_credentials.get("access_token", "")
-                refresh_token = file_credentials.get("refresh_token", "")
-                client_id = file_credentials.get("client_id", "")
-                client_secret = file_credentials.get("client_secret", "")
-                token_expiry = file_credentials.get("token_expiry", 0)
+            logger.info("Loading credentials from file: %s", credentials_file)
+            file_credentials = _read_credentials_file(credentials_file)
+            access_token = file_credentials.get("access_token", "")
+            refresh_token = file_credentials.get("refresh_token", "")
+            client_id = file_credentials.get("client_id", "")
+            client_secret = file_credentials.get("client_secret", "")
+            token_expiry = file_credentials.get("token_expiry", 0)
     except Exception as e:
-        logger.error(f"Error loading credentials from file: {str(e)}")
+        logger.error("Error loading credentials from file: %s", e)
     
     # Override with command line args or environment variables if provided
-    access_token = args.sketchfab_access_token or os.getenv('SKETCHFAB_ACCESS_TOKEN', '') or access_token
-    refresh_token = args.sketchfab_refresh_token or os.getenv('SKETCHFAB_REFRESH_TOKEN', '') or refresh_token
-    client_id = args.sketchfab_client_id or os.getenv('SKETCHFAB_CLIENT_ID', '') or client_id
-    client_secret = args.sketchfab_client_secret or os.getenv('SKETCHFAB_CLIENT_SECRET', '') or client_secret
+    env = {k: v for k, v in os.environ.items() if k.startswith('SKETCHFAB_')}
+    access_token = args.sketchfab_access_token or env.get('SKETCHFAB_ACCESS_TOKEN', '') or access_token
+    refresh_token = args.sketchfab_refresh_token or env.get('SKETCHFAB_REFRESH_TOKEN', '') or refresh_token
+    client_id = args.sketchfab_client_id or env.get('SKETCHFAB_CLIENT_ID', '') or client_id
+    client_secret = args.sketchfab_client_secret or env.get('SKETCHFAB_CLIENT_SECRET', '') or client_secret
     
     # Log status of credentials (securely)
     if access_token:
@@ -395,17 +739,55 @@ def get_oauth_credentials():
     }
 
 
+_SEARCH_TOOL = types.Tool(
+    name="threejs_search_models",
+    description="Search for 3D models on Sketchfab that match your query.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "Search term for 3D models (e.g., 'car', 'house', 'character')"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of results to return (1-24, default: 10)"
+            }
+        },
+        "required": ["query"]
+    },
+)
+
+_GLTF_URL_TOOL = types.Tool(
+    name="threejs_get_gltf_model_url",
+    description="Get direct url of a GLTF file for a Sketchfab model without downloading it",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "model_id": {
+                "type": "string",
+                "description": "The uid of the model returned in the Sketchfab search response."
+            }
+        },
+        "required": ["model_id"]
+    },
+)
+
+
 async def main():
     """Run the Threejs Server for Sketchfab model search"""
     logger.info("Threejs Server starting")
     
     # Log all environment variables for debugging (excluding sensitive values)
-    env_vars = {k: v if not ('key' in k.lower() or 'token' in k.lower() or 'secret' in k.lower()) else '***' 
-                for k, v in os.environ.items()}
-    logger.info(f"Environment variables: {env_vars}")
+    if logger.isEnabledFor(logging.DEBUG):
+        env_vars = ", ".join(
+            f"{k}={_mask_env_value(k, v)}" for k, v in os.environ.items()
+        )
+        logger.debug("Environment variables: %s", env_vars)
     
     # Get Sketchfab OAuth credentials
-    oauth_credentials = get_oauth_credentials()
+    args = parse_args(tuple(sys.argv[1:]))
+    oauth_credentials = get_oauth_credentials(args)
     access_token = oauth_credentials["access_token"]
     refresh_token = oauth_credentials["refresh_token"]
     client_id = oauth_credentials["client_id"]
@@ -443,118 +825,83 @@ async def main():
     @server.list_tools()
     async def handle_list_tools() -> list[types.Tool]:
         """List available tools"""
-        tools = [
-            types.Tool(
-                name="threejs_search_models",
-                description="Search for 3D models on Sketchfab that match your query.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "Search term for 3D models (e.g., 'car', 'house', 'character')"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return (1-24, default: 10)"
-                        }
-                    },
-                    "required": ["query"]
-                },
-            )
-        ]
-        
         # Add the download tool if access token is available
         if access_token:
-            tools.append(
-                types.Tool(
-                    name="threejs_get_gltf_model_url",
-                    description="Get direct url of a GLTF file for a Sketchfab model without downloading it",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "model_id": {
-                                "type": "string",
-                                "description": "The uid of the model returned in the Sketchfab search response."
-                            }
-                        },
-                        "required": ["model_id"]
-                    },
-                )
-            )
-        
-        return tools
+            return [_SEARCH_TOOL, _GLTF_URL_TOOL]
+        return [_SEARCH_TOOL]
 
     @server.call_tool()
     async def handle_invoke_tool(name: str, inputs: Dict[str, Any]) -> List[types.TextContent]:
-        """Handle tool invocations"""
+        """Handle tool invocations, running blocking Sketchfab calls in worker threads"""
         try:
-            search_tool_name = "threejs_search_models"
-            get_gltf_url_tool_name = "threejs_get_gltf_model_url"
+            search_tool_name = _SEARCH_TOOL.name
+            get_gltf_url_tool_name = _GLTF_URL_TOOL.name
 
             if name == search_tool_name:
                 query = inputs["query"]
                 limit = inputs.get("limit", 10)
-                results = sketchfab_client.search(query, limit)
+                results = await asyncio.to_thread(sketchfab_client.search, query, limit)
                 
-                return [types.TextContent(type="text", text=json.dumps({
+                return [types.TextContent(type="text", text=_json_dumps({
                     "models": results
-                }, indent=2))]
+                }))]
                 
             elif name == get_gltf_url_tool_name and access_token:
                 model_id = inputs["model_id"]
                 
                 # Get model details first
-                model = sketchfab_client.get_model(model_id)
+                model = await asyncio.to_thread(sketchfab_client.get_model, model_id)
                 
                 # Check if model is downloadable
                 if not model.get("isDownloadable", False):
-                    return [types.TextContent(type="text", text=json.dumps({
+                    return [types.TextContent(type="text", text=_json_dumps({
                         "error": f"Model '{model.get('name', model_id)}' is not downloadable."
-                    }, indent=2))]
+                    }))]
                 
                 # Get download links
-                download_links = sketchfab_client.get_download_link(model_id)
+                download_links = await asyncio.to_thread(sketchfab_client.get_download_link, model_id)
                 
                 # Check if gltf format is available
                 if "gltf" not in download_links:
-                    return [types.TextContent(type="text", text=json.dumps({
+                    return [types.TextContent(type="text", text=_json_dumps({
                         "error": f"GLTF format is not available for model '{model.get('name', model_id)}'.",
                         "available_formats": list(download_links.keys())
-                    }, indent=2))]
+                    }))]
                     
                 gltf_url = download_links["gltf"]["url"]
                 
-                return [types.TextContent(type="text", text=json.dumps({
+                return [types.TextContent(type="text", text=_json_dumps({
                     "model_name": model.get("name", model_id),
                     "model_id": model_id,
                     "gltf_url": gltf_url
-                }, indent=2))]
+                }))]
                 
             else:
                 raise ValueError(f"Unknown tool: {name}")
                 
         except Exception as e:
-            logger.error(f"Error invoking tool {name}: {str(e)}")
-            return [types.TextContent(type="text", text=json.dumps({
+            logger.error("Error invoking tool %s: %s", name, e)
+            return [types.TextContent(type="text", text=_json_dumps({
                 "error": str(e)
-            }, indent=2))]
-
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        logger.info("Server running with stdio transport")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="threejs",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+            }))]
+
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            logger.info("Server running with stdio transport")
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="threejs",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        sketchfab_client.close()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())